@@ -1,9 +1,12 @@
 from flask import Flask, request, Response
 from data import _products
-import json
+import orjson
 
 app = Flask(__name__)
 
+# index the products by id for O(1) lookups
+_products_by_id = {p['id']: p for p in _products}
+
 def product_to_text(p):
     if not p: return None
 
@@ -12,11 +15,15 @@ def product_to_text(p):
 def products_to_text(products):
     return '\n'.join([product_to_text(p) for p in products])
 
+# supported values of the Accept header; anything else (or no header) is a 406
+ACCEPT_JSON, ACCEPT_TEXT, ACCEPT_UNSUPPORTED = 0, 1, 2
+_ACCEPT_KINDS = {"application/json": ACCEPT_JSON, "text/plain": ACCEPT_TEXT}
+
 def create_response(data=None, status=200):
-    accept = request.headers["Accept"]
-    if accept == "application/json":
-        return Response(json.dumps(data), mimetype="application/json", status=status)
-    elif accept == "text/plain":
+    kind = _ACCEPT_KINDS.get(request.headers.get("Accept", ""), ACCEPT_UNSUPPORTED)
+    if kind == ACCEPT_JSON:
+        return Response(orjson.dumps(data), mimetype="application/json", status=status)
+    elif kind == ACCEPT_TEXT:
         response_text = products_to_text(data) \
             if isinstance(data, list) \
             else product_to_text(data)
@@ -36,15 +43,18 @@ def handle_get_products():
 @app.get("/api/products/<int:p_id>")
 def handle_get_one_product(p_id):
 
-    data = [p for p in _products if p['id']==p_id]
+    product = _products_by_id.get(p_id)
 
-    if len(data)==0:
+    if product is None:
         return create_response(None, status=404)
 
-    return create_response(data[0])
+    return create_response(product)
 
 @app.route("/")
 def index():
     return "Hello, world!"
 
-app.run(debug=True, host="0.0.0.0", port=5001)
\ No newline at end of file
+# development server only; in production run under a WSGI server, e.g.
+#   gunicorn -k gevent -w 4 --worker-connections 1000 -b 0.0.0.0:5001 app:app
+if __name__ == "__main__":
+    app.run(debug=True, host="0.0.0.0", port=5001)
\ No newline at end of file
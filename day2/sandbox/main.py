@@ -12,20 +12,63 @@ GET, PUT, PATCH, DELETE
 
 """
 
-from flask import Flask, jsonify, request
-import json
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+import orjson
+import itertools
 import time
-import uuid
 
 # pip install email-validator
 from email_validator import validate_email, EmailNotValidError
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    routes jsonify() and request.get_json() through orjson,
+    which is several times faster than the stdlib json module
+    """
+    def dumps(self, obj, **kwargs):
+        return self._dumps_bytes(obj).decode()
+
+    def _dumps_bytes(self, obj):
+        # fall back to the provider's default() and allow non-str keys, as jsonify() did
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # skip the bytes -> str -> bytes round trip of the default provider
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps_bytes(obj), mimetype=self.mimetype)
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
-# load all customer data into memory
+# load all customer data into memory (one JSON document per line)
 _customers = []
-with open('./customers.json', encoding='utf-8') as file:
-    _customers = json.load(file)
+with open('./customers.ndjson', 'rb') as file:
+    _customers = [orjson.loads(line) for line in file if line.strip()]
+
+# source of new customer ids; next() on a count is atomic, so concurrent
+# POSTs can't hand out the same id
+_customer_ids = itertools.count(max((c.get('id', 0) for c in _customers), default=0) + 1)
+
+# indexes over _customers for O(1) lookups; kept in sync by handle_post
+_customers_by_id = {c['id']: c for c in _customers if 'id' in c}
+_emails = {c['email'] for c in _customers if 'email' in c}
+_phones = {c['phone'] for c in _customers if 'phone' in c}
+
+# serialized copies of _customers, so that GETs don't re-encode unchanged data;
+# handle_post appends to _encoded_customers and resets _encoded_all
+_encoded_customers = [orjson.dumps(c) for c in _customers]
+_encoded_all = None
+
+# ready-made response bodies for pages of the default size, keyed by page number;
+# a new customer only changes the last page, so handle_post drops just that one
+DEFAULT_PAGE_SIZE = 10
+_default_size_pages = {}
 
 def err_response(message, code=400):
     return jsonify({
@@ -35,12 +78,23 @@ def err_response(message, code=400):
     }), code
 
 
+def json_array(encoded_items):
+    """
+    joins already serialized items into the bytes of a JSON array
+    """
+    return b'[' + b','.join(encoded_items) + b']'
+
+
+def json_response(body):
+    return Response(body, mimetype="application/json")
+
+
 @app.get('/api/v2/customers')
 @app.get('/api/customers')
 def handle_get_many():
     try:
         page = int(request.args.get('page', 1))
-        size = int(request.args.get('size', 10))
+        size = int(request.args.get('size', DEFAULT_PAGE_SIZE))
         if page < 1 or size < 1:
             return err_response('page/size must be more than 0')
     except ValueError:
@@ -49,17 +103,31 @@ def handle_get_many():
     start = (page-1) * size
     end = start + size
 
-    return jsonify(_customers[start:end])
+    if size != DEFAULT_PAGE_SIZE:
+        return json_response(json_array(_encoded_customers[start:end]))
+
+    body = _default_size_pages.get(page)
+    if body is None:
+        body = json_array(_encoded_customers[start:end])
+        # pages past the end are all the same `[]`; don't let them fill the cache
+        if start < len(_encoded_customers):
+            _default_size_pages[page] = body
+
+    return json_response(body)
 
 @app.get('/api/v1/customers')
 def handle_get_many_v1():
-    return jsonify(_customers)
+    global _encoded_all
+
+    if _encoded_all is None:
+        _encoded_all = json_array(_encoded_customers)
+
+    return json_response(_encoded_all)
 
 
-@app.post('/api/customers')
-@app.post('/api/v2/customers')
-@app.post('/api/v1/customers')
 def handle_post():
+    global _encoded_all
+
     req_body = request.get_json()
 
     # validation for missing fields
@@ -83,13 +151,11 @@ def handle_post():
         return err_response(str(e))
 
     # validation for duplicate email
-    all_emails = [c['email'] for c in _customers if 'email' in c]
-    if email in all_emails:
+    if email in _emails:
         return err_response(f'email already exists - {email}')
     
     # validation for duplicate phone
-    all_phones = [c['phone'] for c in _customers if 'phone' in c]
-    if req_body.get('phone') in all_phones:
+    if req_body.get('phone') in _phones:
         return err_response(f'phone already exists - {req_body.get('phone')}')
 
     # copy only these fields from the request body
@@ -97,27 +163,40 @@ def handle_post():
     new_customer = {k:req_body.get(k) for k in all_fields}
 
     # assign an auto-generated id
-    new_customer['id'] = str(uuid.uuid4())
+    new_customer['id'] = next(_customer_ids)
     _customers.append(new_customer)
+    _customers_by_id[new_customer['id']] = new_customer
+    _emails.add(new_customer['email'])
+    _phones.add(new_customer['phone'])
+    _encoded_customers.append(orjson.dumps(new_customer))
+    _encoded_all = None
+    _default_size_pages.pop((len(_encoded_customers) - 1) // DEFAULT_PAGE_SIZE + 1, None)
     
-    # replace the file content with latest data in the variable _customers
-    with open('./customers.json', 'wt') as file:
-        json.dump(_customers, file)
+    # append just the new record, instead of rewriting the whole file
+    with open('./customers.ndjson', 'ab') as file:
+        file.write(orjson.dumps(new_customer) + b'\n')
 
     return jsonify(new_customer), 201
 
 
-@app.get("/api/customers/<uuid:customer_id>")
-@app.get("/api/v1/customers/<uuid:customer_id>")
-@app.get("/api/v2/customers/<uuid:customer_id>")
 def handle_get_one(customer_id):
-    customer_id = str(customer_id)
-    filtered_customers = [c for c in _customers if c.get('id') == customer_id]
+    customer = _customers_by_id.get(customer_id)
 
-    if len(filtered_customers) == 0:
+    if customer is None:
         return err_response(f'customer with id {customer_id} not found')
     
-    return jsonify(filtered_customers[0])
+    return jsonify(customer)
+
+
+# POST and GET-by-id behave the same in every API version, so they are
+# registered once per version prefix (GET of the collection differs per version)
+for prefix in ('/api/customers', '/api/v1/customers', '/api/v2/customers'):
+    app.add_url_rule(prefix, view_func=handle_post, methods=['POST'])
+    app.add_url_rule(f'{prefix}/<int:customer_id>', view_func=handle_get_one, methods=['GET'])
 
 
-app.run(debug=True, host="0.0.0.0", port=5002)
+# development server only; in production run under a WSGI server, e.g.
+#   gunicorn -k gevent -w 1 --worker-connections 1000 -b 0.0.0.0:5002 main:app
+# (a single worker, since _customers lives in this process's memory)
+if __name__ == "__main__":
+    app.run(debug=True, host="0.0.0.0", port=5002)
@@ -13,14 +13,24 @@ In flask-restful, these are important concepts:
 
 """
 
-from flask import Flask, request
+from flask import Flask, Response, request, make_response
 from flask_restful import Resource, Api
 import json
+import orjson
 from datetime import datetime
 
 app = Flask(__name__)
 api = Api(app)
 
+
+@api.representation('application/json')
+def output_json(data, code, headers=None):
+    """serialize resource return values with orjson instead of stdlib json"""
+    resp = make_response(orjson.dumps(data), code)
+    resp.headers.extend(headers or {})
+    return resp
+
+
 _employees = []
 
 # load data from employees.json
@@ -29,15 +39,21 @@ with open('employees.json', encoding='utf-8') as f:
 
 next_id = max([e['id'] for e in _employees]) + 1
 
+# index by id for O(1) lookups; kept in sync by EmployeeListResource.post
+_employees_by_id = {e['id']: e for e in _employees}
+
+# _employees serialized once and reused by GETs until the next POST
+_employees_json = None
+
 def error_response(e, status=400):
     return {"message": e, "when": str(datetime.now())}, status
 
 
 class EmployeeResource(Resource):
     def get(self, emp_id):
-        result = [e for e in _employees if e['id']==emp_id]
-        if len(result):
-            return result[0], 200
+        employee = _employees_by_id.get(emp_id)
+        if employee is not None:
+            return employee, 200
         return error_response(f'no data found for id {emp_id}', 404)
     
     def put(self, emp_id):
@@ -51,10 +67,15 @@ class EmployeeResource(Resource):
 
 class EmployeeListResource(Resource):
     def get(self):
-        return _employees, 200
+        global _employees_json
+
+        if _employees_json is None:
+            _employees_json = orjson.dumps(_employees)
+
+        return Response(_employees_json, mimetype="application/json")
 
     def post(self):
-        global next_id
+        global next_id, _employees_json
 
         req_body = request.get_json()
         # validation for missing fields
@@ -75,6 +96,8 @@ class EmployeeListResource(Resource):
         next_id += 1
 
         _employees.append(new_employee)
+        _employees_by_id[new_employee['id']] = new_employee
+        _employees_json = None
         
         with open('./employees.json', 'wt') as file:
             json.dump(_employees, file)
@@ -84,4 +107,8 @@ class EmployeeListResource(Resource):
 api.add_resource(EmployeeListResource, "/api/employees")
 api.add_resource(EmployeeResource, "/api/employees/<int:emp_id>")
 
-app.run(host="0.0.0.0", port=8080, debug=True)
\ No newline at end of file
+# development server only; in production run under a WSGI server, e.g.
+#   gunicorn -k gevent -w 1 --worker-connections 1000 -b 0.0.0.0:8080 app:app
+# (a single worker, since _employees lives in this process's memory)
+if __name__ == "__main__":
+    app.run(host="0.0.0.0", port=8080, debug=True)
\ No newline at end of file
@@ -1,6 +1,6 @@
-from flask import Flask, request, Response
-import json
-from dao import Book, BookJsonEncoder, add_book, get_all, get_by_id
+from flask import Flask, request, Response, stream_with_context
+import orjson
+from dao import Book, BookJsonEncoder, add_book, add_books, get_by_id, iter_all
 from datetime import datetime
 from flask_cors import CORS
 
@@ -8,18 +8,37 @@ app = Flask('Book Service')
 CORS(app)
 
 def create_response(data, status=200):
-    return Response(json.dumps(data, cls=BookJsonEncoder), \
+    return Response(orjson.dumps(data, default=BookJsonEncoder().default), \
                     status=status, \
                         mimetype="application/json")
 
 def create_error(message, status=400):
     err = {"message": message, "timestamp": str(datetime.now())}
-    return Response(json.dumps(err), status=status, mimetype="application/json")
+    return Response(orjson.dumps(err), status=status, mimetype="application/json")
+
+def stream_json_list(items):
+    """
+    streams the books as a JSON array in ~8 KB chunks; with iter_all()
+    the rows are still being fetched while the first chunks go out
+    """
+    def generate():
+        buffer = bytearray(b'[')
+        for i, item in enumerate(items):
+            if i:
+                buffer += b','
+            buffer += orjson.dumps(item)
+            if len(buffer) >= 8192:
+                yield bytes(buffer)
+                buffer.clear()
+        buffer += b']'
+        yield bytes(buffer)
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
 
 @app.get("/api/books")
 def handle_get_all():
-    all_books = get_all()
-    return create_response(all_books)
+    return stream_json_list(iter_all())
 
 @app.get("/api/books/<int:book_id>")
 def handle_get_one(book_id):
@@ -32,9 +51,15 @@ def handle_get_one(book_id):
 @app.post("/api/books")
 def handle_post():
     data = request.get_json()
+    if isinstance(data, list):
+        return create_response(add_books(data), 201)
+
     book = Book(**data)
     book = add_book(book)
     return create_response(book, 201)
 
 
-app.run(host="0.0.0.0", port=8080, debug=True)
+# development server only; in production run under a WSGI server, e.g.
+#   gunicorn -k gevent -w 4 --worker-connections 1000 -b 0.0.0.0:8080 app:app
+if __name__ == "__main__":
+    app.run(host="0.0.0.0", port=8080, debug=True)
@@ -3,14 +3,29 @@ This is a utility module for providing DAO operations on a
 model class called Book
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Double
+from sqlalchemy import create_engine, event, insert, select, Column, Integer, String, Double
 from sqlalchemy.orm import declarative_base, sessionmaker
+from dataclasses import asdict, dataclass
 import json
 from pprint import pprint
 
 _db_engine = create_engine("sqlite:///booksdb.sqlite")
 Session = sessionmaker(bind=_db_engine)
 
+
+@event.listens_for(_db_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    tunes every new SQLite connection: WAL lets readers and a writer work
+    concurrently, and synchronous=NORMAL is safe under WAL with far fewer fsyncs
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
 Base = declarative_base()
 
 
@@ -32,10 +47,35 @@ class Book(Base):
         self.price = kwargs.get('price')
         self.publisher = kwargs.get('publisher')
 
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "title": self.title,
+            "author": self.author,
+            "publisher": self.publisher,
+            "price": self.price
+        }
+
     def __repr__(self):
         return f'Book (title={self.title!r}, author={self.author!r}, price={self.price!r}, publisher={self.publisher!r})'
 
 
+@dataclass(slots=True)
+class BookRow:
+    """
+    Read-only view of a row in the books table, used by the query methods.
+    orjson serializes dataclasses natively, so there is no per-row dict.
+    """
+    id: int
+    title: str
+    author: str | None
+    publisher: str | None
+    price: float | None
+
+
+_book_columns = (Book.id, Book.title, Book.author, Book.publisher, Book.price)
+
+
 Base.metadata.create_all(_db_engine)
 
 
@@ -51,26 +91,59 @@ def add_book(book):
         return book
   
 
+def add_books(books):
+    """
+    this method adds a batch of books (given as dicts) in one transaction,
+    with a single executemany-style INSERT instead of one commit per book;
+    returns the inserted rows as BookRow objects
+    """
+    rows = [{k: b.get(k) for k in ('title', 'author', 'publisher', 'price')} for b in books]
+    if not rows:
+        return []
+    with Session() as session:
+        stmt = insert(Book.__table__).returning(*_book_columns)
+        result = [BookRow(*row) for row in session.execute(stmt, rows)]
+        session.commit()
+        return result
+
+
 def get_all():
     """
-    this method returns all books
+    this method returns all books as BookRow objects
+
+    rows are read with a Core select on the table, which skips building
+    (and then discarding) a mapped Book instance for every row
     """
     with Session() as session: 
-        return session.query(Book).all()
+        return [BookRow(*row) for row in session.execute(select(*_book_columns))]
+
+
+def iter_all(batch_size=500):
+    """
+    this method yields all books as BookRow objects, fetching `batch_size` rows at a time
+    """
+    with Session() as session:
+        stmt = select(*_book_columns).execution_options(yield_per=batch_size)
+        for row in session.execute(stmt):
+            yield BookRow(*row)
 
 
 def get_by_id(book_id):
+    """
+    this method returns the book with the given id as a BookRow, or None
+    """
     with Session() as session:
-        return session.get(Book, book_id)
+        stmt = select(*_book_columns).where(Book.id == book_id)
+        row = session.execute(stmt).first()
+        return BookRow(*row) if row else None
     
 
 class BookJsonEncoder(json.JSONEncoder):
     def default(self, o):
         if isinstance(o, Book):
-            d = o.__dict__
-            if '_sa_instance_state' in d:
-                d.pop('_sa_instance_state')
-            return d
+            return o.to_dict()
+        if isinstance(o, BookRow):
+            return asdict(o)
         return super().default(o)
 
 
@@ -1,13 +1,28 @@
-import requests
+import asyncio
 
+# pip install "httpx[http2]"
+import httpx
+
+API_URL = 'https://omdbapi.com/'
+API_KEY = '30d67521'
+
+
+async def search_all(titles):
+    # one pooled client: the TLS connection is set up once and reused,
+    # and the searches run concurrently instead of one after another;
+    # a failed search comes back as its exception instead of losing the rest
+    async with httpx.AsyncClient(http2=True) as client:
+        return await asyncio.gather(*[
+            client.get(API_URL, params={'apikey': API_KEY, 's': title})
+            for title in titles
+        ], return_exceptions=True)
 
-def main():
-    title = input('Enter movie title to search: ')
-    key = '30d67521'
-    url = f'https://omdbapi.com/?apikey={key}&s={title}'
-    r = requests.get(url)
 
-    if r.status_code == 200:
+def print_result(title, r):
+    print(f'Results for {title!r}')
+    if isinstance(r, Exception):
+        print(f'Request failed: {r!r}')
+    elif r.status_code == 200:
         resp = r.json()
         movies = resp['Search']
         print(f'Found {resp['totalResults']} entries')
@@ -18,5 +33,15 @@ def main():
         print(f'Got an error: {r.text}')
 
 
+def main():
+    titles = input('Enter movie title(s) to search, separated by commas: ')
+    titles = [t.strip() for t in titles.split(',') if t.strip()]
+
+    responses = asyncio.run(search_all(titles))
+    for title, r in zip(titles, responses):
+        print_result(title, r)
+        print()
+
+
 if __name__ == '__main__':
     main()
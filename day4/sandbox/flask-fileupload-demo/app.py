@@ -1,7 +1,13 @@
+import contextlib
 import os
+import hashlib
+import mimetypes
+from typing import Annotated
 from uuid import uuid4
-from flask import Flask, request, jsonify, send_from_directory, url_for, abort
+import msgspec
+from flask import Flask, Response, request, jsonify, send_from_directory, url_for, abort
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, or_
 from werkzeug.utils import secure_filename
 
 # -------------------
@@ -16,13 +22,34 @@ app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 # File upload settings
 app.config["UPLOAD_FOLDER"] = os.path.join(os.getcwd(), "uploads")
 app.config["MAX_CONTENT_LENGTH"] = 2 * 1024 * 1024  # 2 MB max
-ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
+ALLOWED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif")
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # read/write uploads 1 MB at a time
+
+# When running behind nginx, set this to an `internal` location that aliases
+# UPLOAD_FOLDER, e.g. "/internal-uploads/"; nginx then sends the photo bytes
+# itself (via sendfile) and Python never touches them:
+#
+#   location /internal-uploads/ { internal; alias /path/to/uploads/; }
+app.config["PHOTO_ACCEL_REDIRECT_PREFIX"] = os.environ.get("PHOTO_ACCEL_REDIRECT_PREFIX")
 
 # Ensure upload folder exists
 os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
 db = SQLAlchemy(app)
 
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL journal + synchronous=NORMAL: readers don't block the writer and
+    commits need far fewer fsyncs; temp tables and mmap keep reads in memory
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
 # -------------------
 # Model
 # -------------------
@@ -35,40 +62,115 @@ class Customer(db.Model):
     phone = db.Column(db.String(20), unique=True, nullable=False)
     photo_filename = db.Column(db.String(255))        # stored filename on disk
     photo_original_name = db.Column(db.String(255))   # original upload name (for reference)
-
-    def to_dict(self):
+    photo_digest = db.Column(db.String(32))           # blake2b of the photo bytes, to spot re-uploads
+
+    def to_dict(self, photo_url_template=None):
+        """
+        photo_url_template (from photo_url_template()) lets list endpoints
+        build photo URLs without reverse-routing once per row.
+        """
+        if not self.photo_filename:
+            photo_url = None
+        elif photo_url_template:
+            photo_url = photo_url_template.format(self.id)
+        else:
+            photo_url = url_for("get_customer_photo", id=self.id, _external=True)
         return {
             "id": self.id,
             "name": self.name,
             "city": self.city,
             "email": self.email,
             "phone": self.phone,
-            "photo_url": url_for("get_customer_photo", id=self.id, _external=True) if self.photo_filename else None,
+            "photo_url": photo_url,
         }
 
+# -------------------
+# Request schema
+# -------------------
+NonEmptyStr = Annotated[str, msgspec.Meta(min_length=1)]
+
+class CustomerForm(msgspec.Struct):
+    name: NonEmptyStr
+    email: NonEmptyStr
+    phone: NonEmptyStr
+    city: str | None = None
+
 # -------------------
 # Helpers
 # -------------------
 def allowed_file(filename: str) -> bool:
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+    # str.endswith with a tuple checks every suffix in C; the suffixes include the dot
+    return filename.lower().endswith(ALLOWED_EXTENSIONS)
 
 def save_uploaded_photo(file_storage):
     """
     Validates & saves an uploaded photo.
-    Returns (stored_filename, original_filename).
+    Returns (stored_filename, original_filename, digest).
+
+    Every upload gets a file of its own, so deleting one customer's photo can
+    never pull the file out from under another; the digest of the content,
+    computed while it is copied to disk, is returned for spotting re-uploads.
     """
     if file_storage and file_storage.filename:
         original_name = secure_filename(file_storage.filename)
         if not allowed_file(original_name):
             abort(400, description="Invalid file type. Allowed: png, jpg, jpeg, gif")
         ext = os.path.splitext(original_name)[1].lower()
-        stored_name = f"{uuid4().hex}{ext}"  # avoid collisions
-        save_path = os.path.join(app.config["UPLOAD_FOLDER"], stored_name)
-        file_storage.save(save_path)
-        return stored_name, original_name
-    return None, None
+        digest = hashlib.blake2b(digest_size=16)
+        tmp_path = os.path.join(app.config["UPLOAD_FOLDER"], f".{uuid4().hex}.part")
+        try:
+            with open(tmp_path, "wb") as out:
+                while chunk := file_storage.stream.read(UPLOAD_CHUNK_SIZE):
+                    out.write(chunk)
+                    digest.update(chunk)
+        except BaseException:
+            # client disconnect, disk full, ...: don't leave the partial file behind
+            # (if open() itself failed there is none, and the original error wins)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+            raise
+        stored_name = f"{uuid4().hex}{ext}"
+        os.replace(tmp_path, os.path.join(app.config["UPLOAD_FOLDER"], stored_name))
+        return stored_name, original_name, digest.hexdigest()
+    return None, None, None
+
+def photo_url_template():
+    """
+    Returns the external photo URL as a format string with `{}` in place
+    of the customer id, e.g. "http://host/api/customers/{}/photo".
+    """
+    prefix, suffix = url_for("get_customer_photo", id=0, _external=True).rsplit("/0/", 1)
+    return prefix + "/{}/" + suffix
+
+def find_duplicate(email, phone, exclude_id=None):
+    """
+    Checks email and phone uniqueness with a single query.
+    Returns "email" or "phone" for the first one already taken, else None.
+    """
+    conditions = []
+    if email:
+        conditions.append(Customer.email == email)
+    if phone:
+        conditions.append(Customer.phone == phone)
+    if not conditions:
+        return None
+
+    stmt = db.select(Customer.email, Customer.phone).where(or_(*conditions))
+    if exclude_id is not None:
+        stmt = stmt.where(Customer.id != exclude_id)
+    rows = db.session.execute(stmt).all()
+
+    if email and any(row.email == email for row in rows):
+        return "email"
+    if phone and any(row.phone == phone for row in rows):
+        return "phone"
+    return None
 
 def delete_photo_if_exists(stored_filename):
+    """
+    Deletes a customer's stored photo.
+    Call it after committing the change that dropped the reference.
+    """
     if not stored_filename:
         return
     path = os.path.join(app.config["UPLOAD_FOLDER"], stored_filename)
@@ -90,30 +192,27 @@ def create_customer():
     Fields: name, city, email, phone, photo (file)
     """
     # Validate form fields
-    name = request.form.get("name")
-    city = request.form.get("city")
-    email = request.form.get("email")
-    phone = request.form.get("phone")
-
-    if not all([name, email, phone]):
+    try:
+        form = msgspec.convert(request.form.to_dict(), CustomerForm)
+    except msgspec.ValidationError:
         return jsonify({"error": "name, email and phone are required"}), 400
 
     # Check uniqueness for email/phone (simple check; database uniqueness enforces too)
-    if Customer.query.filter_by(email=email).first():
-        return jsonify({"error": "email already exists"}), 409
-    if Customer.query.filter_by(phone=phone).first():
-        return jsonify({"error": "phone already exists"}), 409
+    duplicate = find_duplicate(form.email, form.phone)
+    if duplicate:
+        return jsonify({"error": f"{duplicate} already exists"}), 409
 
     photo_file = request.files.get("photo")
-    stored_name, original_name = save_uploaded_photo(photo_file)
+    stored_name, original_name, photo_digest = save_uploaded_photo(photo_file)
 
     customer = Customer(
-        name=name.strip(),
-        city=(city or "").strip(),
-        email=email.strip(),
-        phone=phone.strip(),
+        name=form.name.strip(),
+        city=(form.city or "").strip(),
+        email=form.email.strip(),
+        phone=form.phone.strip(),
         photo_filename=stored_name,
         photo_original_name=original_name,
+        photo_digest=photo_digest,
     )
     db.session.add(customer)
     db.session.commit()
@@ -124,7 +223,8 @@ def create_customer():
 @app.route("/api/customers", methods=["GET"])
 def list_customers():
     customers = Customer.query.order_by(Customer.id).all()
-    return jsonify({"data": [c.to_dict() for c in customers]}), 200
+    template = photo_url_template()
+    return jsonify({"data": [c.to_dict(template) for c in customers]}), 200
 
 
 @app.route("/api/customers/<int:id>", methods=["GET"])
@@ -147,10 +247,9 @@ def update_customer(id):
     email = request.form.get("email")
     phone = request.form.get("phone")
 
-    if email and Customer.query.filter(Customer.email == email, Customer.id != id).first():
-        return jsonify({"error": "email already exists"}), 409
-    if phone and Customer.query.filter(Customer.phone == phone, Customer.id != id).first():
-        return jsonify({"error": "phone already exists"}), 409
+    duplicate = find_duplicate(email, phone, exclude_id=id)
+    if duplicate:
+        return jsonify({"error": f"{duplicate} already exists"}), 409
 
     if name: customer.name = name.strip()
     if city is not None: customer.city = city.strip()
@@ -160,22 +259,31 @@ def update_customer(id):
     # Replace photo if provided
     photo_file = request.files.get("photo")
     if photo_file and photo_file.filename:
-        stored_name, original_name = save_uploaded_photo(photo_file)
-        # delete old
-        delete_photo_if_exists(customer.photo_filename)
-        customer.photo_filename = stored_name
+        stored_name, original_name, photo_digest = save_uploaded_photo(photo_file)
+        if customer.photo_filename and photo_digest == customer.photo_digest:
+            # the same photo again: keep the file we have
+            stale_photo = stored_name
+        else:
+            stale_photo = customer.photo_filename
+            customer.photo_filename = stored_name
+            customer.photo_digest = photo_digest
         customer.photo_original_name = original_name
+    else:
+        stale_photo = None
 
     db.session.commit()
+    # delete the unused file only once the change is committed
+    delete_photo_if_exists(stale_photo)
     return jsonify({"message": "updated", "data": customer.to_dict()}), 200
 
 
 @app.route("/api/customers/<int:id>", methods=["DELETE"])
 def delete_customer(id):
     customer = Customer.query.get_or_404(id)
-    delete_photo_if_exists(customer.photo_filename)
+    photo = customer.photo_filename
     db.session.delete(customer)
     db.session.commit()
+    delete_photo_if_exists(photo)
     return jsonify({"message": "deleted"}), 200
 
 
@@ -187,12 +295,26 @@ def get_customer_photo(id):
     customer = Customer.query.get_or_404(id)
     if not customer.photo_filename:
         abort(404, description="No photo for this customer")
+
+    prefix = app.config["PHOTO_ACCEL_REDIRECT_PREFIX"]
+    if prefix:
+        mimetype, _ = mimetypes.guess_type(customer.photo_filename)
+        response = Response(status=200, mimetype=mimetype or "application/octet-stream")
+        response.headers["X-Accel-Redirect"] = prefix + customer.photo_filename
+        return response
+
+    # send_from_directory hands the open file to the WSGI server's
+    # file_wrapper, which gunicorn serves with sendfile(2)
     return send_from_directory(app.config["UPLOAD_FOLDER"], customer.photo_filename)
 
 
 # Initialize DB
 with app.app_context():
+    if db.engine.dialect.name == "sqlite":
+        event.listen(db.engine, "connect", set_sqlite_pragmas)
     db.create_all()
 
+# development server only; in production run under a WSGI server, e.g.
+#   gunicorn -k gevent -w 4 --worker-connections 1000 -b 0.0.0.0:8080 app:app
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=8080)
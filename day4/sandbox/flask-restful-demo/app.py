@@ -1,6 +1,7 @@
-from flask import Flask, request
+from flask import Flask, Response, request, stream_with_context
 from flask_restful import Resource, Api
 from datetime import datetime
+import orjson
 from flask_sqlalchemy import SQLAlchemy
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -51,6 +52,26 @@ def error_response(e, status=400):
     return {"message": e, "when": str(datetime.now())}, status
 
 
+def stream_json_list(items):
+    """
+    streams the employee rows as a JSON array in ~8 KB chunks, so
+    listing a large table doesn't hold the whole body in memory
+    """
+    def generate():
+        buffer = bytearray(b'[')
+        for i, item in enumerate(items):
+            if i:
+                buffer += b','
+            buffer += orjson.dumps(item)
+            if len(buffer) >= 8192:
+                yield bytes(buffer)
+                buffer.clear()
+        buffer += b']'
+        yield bytes(buffer)
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+
 @app.post("/api/auth/login")
 def handle_login():
     payload = request.get_json()
@@ -130,7 +151,15 @@ class EmployeeListResource(Resource):
     
     @limiter.limit("5 per minute")
     def get(self):
-        return [e.to_dict() for e in Employee.query.all()]
+        def employees():
+            # run the query inside the stream, so the rows are fetched
+            # (500 at a time) while the response is being written; a Core
+            # select on the table skips building an Employee per row
+            stmt = db.select(Employee.__table__).execution_options(yield_per=500)
+            for row in db.session.execute(stmt).mappings():
+                yield dict(row)
+
+        return stream_json_list(employees())
 
     @jwt_required()
     def post(self):
@@ -163,8 +192,12 @@ class EmployeeListResource(Resource):
 api.add_resource(EmployeeListResource, "/api/employees")
 api.add_resource(EmployeeResource, "/api/employees/<int:emp_id>")
 
-if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
+with app.app_context():
+    db.create_all()
 
+# development server only; in production run under a WSGI server, e.g.
+#   gunicorn -k gevent -w 1 --worker-connections 1000 -b 0.0.0.0:8080 app:app
+# (a single worker, since the limiter counts in this process's memory; with N
+# workers "5 per minute" lets through 5*N)
+if __name__ == '__main__':
     app.run(host="0.0.0.0", port=8080, debug=True)
\ No newline at end of file
@@ -1,11 +1,15 @@
 from flask import Flask
+from sqlalchemy.orm import configure_mappers
 from config import Config
 from extensions import db
+from models import Customer
+from utils import OrjsonProvider
 from customers.routes import customers_bp
 from categories.routes import cat_bp
 
 def create_app():
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     app.config.from_object(Config)
 
     db.init_app(app)
@@ -14,6 +18,10 @@ def create_app():
 
     with app.app_context():
         db.create_all()
+        # do the one-off work of the first request now: configure the mappers,
+        # open a pooled connection and run a query through the compiler
+        configure_mappers()
+        db.session.execute(db.select(Customer).limit(0))
 
     return app
 
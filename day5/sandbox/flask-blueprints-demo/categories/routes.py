@@ -1,4 +1,7 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
+import hashlib
+import itertools
+import orjson
 
 cat_bp = Blueprint("categories", __name__, url_prefix="/api/categories")
 
@@ -8,18 +11,47 @@ categories = [
     { "id": 3, "name": "Produce" }
 ]
 
+# source of new category ids; next() on a count is atomic, so concurrent
+# POSTs (e.g. under threaded workers) can't hand out the same id
+_category_ids = itertools.count(max((c["id"] for c in categories), default=0) + 1)
+
+# bumped on every change to `categories`; taken from a count so that
+# concurrent POSTs can't both write back the same number
+_versions = itertools.count(1)
+_version = 0
+
+# (version, body, etag) of the last serialized `categories`; a GET rebuilds it
+# when the version has moved on. The ETag hashes the body rather than using the
+# version, which is per process and would collide across gunicorn workers
+_cached = None
+
 @cat_bp.get("/")
 def handle_get_all():
-    return jsonify(categories)
+    global _cached
+    cached = _cached
+    if cached is None or cached[0] != _version:
+        # read the version before encoding: if a POST lands meanwhile, the
+        # entry is stored under the old version and rebuilt by the next GET
+        version = _version
+        body = orjson.dumps(categories)
+        cached = (version, body, hashlib.blake2b(body, digest_size=16).hexdigest())
+        _cached = cached
+
+    resp = Response(cached[1], mimetype="application/json")
+    resp.set_etag(cached[2])
+    return resp.make_conditional(request)
 
 @cat_bp.post("/")
 def handle_post():
-    data = request.get_json()
+    global _version
+    # a missing or non-JSON body is just a missing name
+    data = request.get_json(silent=True) or {}
     cat_name = data.get("name")
     if not cat_name:
         return jsonify({"error": "`name` is missing"}), 400
     
-    new_cat_id = 1 + max([c.get("id") for c in categories])
+    new_cat_id = next(_category_ids)
     new_cat = {"id": new_cat_id, "name": cat_name}
     categories.append(new_cat)
+    _version = next(_versions)
     return jsonify(new_cat), 201
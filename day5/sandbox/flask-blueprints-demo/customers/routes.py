@@ -1,31 +1,95 @@
-from flask import Blueprint, request, jsonify
+from typing import Annotated
+
+import msgspec
+from flask import Blueprint, abort, jsonify, request
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from extensions import db
 from models import Customer
+from utils import stream_json_list
 
 customers_bp = Blueprint("customers", __name__, url_prefix="/api/customers")
 
-@customers_bp.route("/", methods=["POST"])
-def create_customer():
-    data = request.json
-    name, city, email, phone = data.get("name"), data.get("city"), data.get("email"), data.get("phone")
+# The list statement, CustomerIn and insert_customer below follow
+# flask-swagger-demo/customers/routes.py; make changes there first.
+
+# columns read by the query endpoints, which serialize row mappings directly
+_customer_columns = (Customer.id, Customer.name, Customer.city, Customer.email, Customer.phone)
+
+# column-only select, built once; streamed 500 rows at a time
+_list_customers_stmt = db.select(*_customer_columns).execution_options(yield_per=500)
+
+NonEmptyStr = Annotated[str, msgspec.Meta(min_length=1)]
 
-    if not (name and email and phone):
-        return jsonify({"error": "name, email, phone are required"}), 400
+class CustomerIn(msgspec.Struct):
+    """request body of create_customer"""
+    name: NonEmptyStr
+    email: NonEmptyStr
+    phone: NonEmptyStr
+    city: str | None = None
 
-    if Customer.query.filter_by(email=email).first():
-        return jsonify({"error": "email already exists"}), 409
+# dialects that support INSERT ... ON CONFLICT DO NOTHING ... RETURNING
+_ON_CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
 
-    customer = Customer(name=name, city=city, email=email, phone=phone)
-    db.session.add(customer)
+def insert_customer(**values):
+    """
+    Inserts a customer and returns it as a dict, or None if the email or
+    phone is already taken. Where the dialect allows, the duplicate check,
+    the insert and fetching the new id are a single statement.
+    """
+    dialect_insert = _ON_CONFLICT_INSERTS.get(db.engine.dialect.name)
+    if dialect_insert is None:
+        # let the unique indexes reject duplicates
+        customer = Customer(**values)
+        db.session.add(customer)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return None
+        return customer.to_dict()
+
+    stmt = (
+        dialect_insert(Customer)
+        .values(**values)
+        .on_conflict_do_nothing()
+        .returning(*_customer_columns)
+    )
+    row = db.session.execute(stmt).mappings().first()
+    if row is None:
+        db.session.rollback()
+        return None
+    customer = dict(row)
     db.session.commit()
-    return jsonify(customer.to_dict()), 201
+    return customer
+
+@customers_bp.route("/", methods=["POST"])
+def create_customer():
+    # parse and validate the body in one pass, straight into a CustomerIn
+    try:
+        data = msgspec.json.decode(request.get_data(), type=CustomerIn)
+    except msgspec.ValidationError as e:
+        # names the offending field, e.g. "Object missing required field `phone`"
+        return jsonify({"error": str(e)}), 400
+    except msgspec.DecodeError as e:
+        return jsonify({"error": f"malformed JSON body: {e}"}), 400
+
+    customer = insert_customer(**msgspec.structs.asdict(data))
+    if customer is None:
+        email_taken = db.session.query(db.literal(True)).filter(Customer.email == data.email).scalar()
+        return jsonify({"error": f"{'email' if email_taken else 'phone'} already exists"}), 409
+
+    return jsonify(customer), 201
 
 @customers_bp.route("/", methods=["GET"])
 def list_customers():
-    customers = Customer.query.all()
-    return jsonify([c.to_dict() for c in customers])
+    rows = db.session.execute(_list_customers_stmt).mappings()
+    return stream_json_list(dict(row) for row in rows)
 
 @customers_bp.route("/<int:id>", methods=["GET"])
 def get_customer(id):
-    customer = Customer.query.get_or_404(id)
-    return jsonify(customer.to_dict())
\ No newline at end of file
+    stmt = db.select(*_customer_columns).where(Customer.id == id)
+    customer = db.session.execute(stmt).mappings().first()
+    if customer is None:
+        abort(404)
+    return jsonify(dict(customer))
\ No newline at end of file
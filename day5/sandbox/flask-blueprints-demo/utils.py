@@ -0,0 +1,47 @@
+"""
+Copy of flask-swagger-demo/utils.py; make changes there and copy them here.
+"""
+from flask import current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+import orjson
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    routes jsonify() and request.get_json() through orjson,
+    which is several times faster than the stdlib json module
+    """
+    def dumps(self, obj, **kwargs):
+        return self._dumps_bytes(obj).decode()
+
+    def _dumps_bytes(self, obj):
+        # fall back to the provider's default() and allow non-str keys, as jsonify() did
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # skip the bytes -> str -> bytes round trip of the default provider
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def stream_json_list(items):
+    """
+    streams `items` as a JSON array, flushing roughly every 8 KB
+    instead of building the whole body in memory first
+    """
+    def generate():
+        buffer = bytearray(b"[")
+        for i, item in enumerate(items):
+            if i:
+                buffer += b","
+            buffer += orjson.dumps(item)
+            if len(buffer) >= 8192:
+                yield bytes(buffer)
+                buffer.clear()
+        buffer += b"]"
+        yield bytes(buffer)
+
+    return current_app.response_class(stream_with_context(generate()), mimetype="application/json")
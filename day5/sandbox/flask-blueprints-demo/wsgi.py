@@ -0,0 +1,11 @@
+"""
+WSGI entry point for production servers, e.g.
+
+    gunicorn -k gevent -w 1 --worker-connections 1000 -b 0.0.0.0:8080 wsgi:app
+
+A single worker, since the categories live in this process's memory; with
+more, each worker would keep its own drifting copy.
+"""
+from app import create_app
+
+app = create_app()
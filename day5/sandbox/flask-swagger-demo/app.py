@@ -1,11 +1,26 @@
 from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.orm import configure_mappers
 from config import Config
 from extensions import db
+from models import Customer
+from utils import OrjsonProvider
 from customers.routes import customers_bp
 from flasgger import Swagger
 
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL journal + synchronous=NORMAL: readers don't block the writer and
+    commits need far fewer fsyncs
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
 def create_app():
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     app.config.from_object(Config)
 
     db.init_app(app)
@@ -17,7 +32,13 @@ def create_app():
     swagger = Swagger(app)
 
     with app.app_context():
+        if db.engine.dialect.name == "sqlite":
+            event.listen(db.engine, "connect", set_sqlite_pragmas)
         db.create_all()
+        # do the one-off work of the first request now: configure the mappers,
+        # open a pooled connection and run a query through the compiler
+        configure_mappers()
+        db.session.execute(db.select(Customer).limit(0))
 
     return app
 
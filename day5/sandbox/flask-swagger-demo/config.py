@@ -1,4 +1,22 @@
 class Config:
     SQLALCHEMY_DATABASE_URI = "sqlite:///app.db"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SECRET_KEY = "dev"
\ No newline at end of file
+    SECRET_KEY = "dev"
+
+    # keep enough warm connections for concurrent requests
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": 20,
+        "max_overflow": 40,
+    }
+    if not SQLALCHEMY_DATABASE_URI.startswith("sqlite"):
+        # a database server may drop idle connections: recycle them before it
+        # times them out, and test each one on checkout so a dropped one is
+        # replaced instead of failing a request
+        SQLALCHEMY_ENGINE_OPTIONS |= {
+            "pool_recycle": 1800,
+            "pool_pre_ping": True,
+        }
+    else:
+        # writers take turns on the file lock; under threaded workers wait
+        # for it rather than failing at once with "database is locked"
+        SQLALCHEMY_ENGINE_OPTIONS["connect_args"] = {"timeout": 30}
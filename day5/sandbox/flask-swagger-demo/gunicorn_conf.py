@@ -0,0 +1,26 @@
+"""
+gunicorn settings for the swagger demo
+
+    gunicorn -c gunicorn_conf.py wsgi:app
+"""
+from multiprocessing import cpu_count
+
+bind = "0.0.0.0:8080"
+
+# threaded workers: while one thread waits on the database, the others keep serving
+worker_class = "gthread"
+workers = 2 * cpu_count() + 1
+threads = 8
+
+# import the app once in the master, so workers fork with it already loaded
+preload_app = True
+
+
+def post_fork(server, worker):
+    # the master touched the database (create_all) before forking; don't let
+    # the workers reuse the pooled connections they inherited from it
+    from extensions import db
+    from wsgi import app
+
+    with app.app_context():
+        db.engine.dispose(close=False)
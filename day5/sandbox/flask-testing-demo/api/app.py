@@ -1,15 +1,53 @@
-from flask import Flask
+from flask import Flask, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import configure_mappers
 from api.config import Config
 from api.extensions import db
+from api.models import Customer
+from api.utils import OrjsonProvider
 from api.customers.routes import customers_bp
 from flasgger import Swagger
 
-def create_app():
+# statements that only manage transactions; they are left out of the count so
+# it reflects the queries a view runs, not how its session brackets them (e.g.
+# a begin_nested() adds a SAVEPOINT and a RELEASE around the same queries)
+_TRANSACTION_CONTROL = ("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK")
+
+def count_queries(app):
+    """
+    Counts the SQL statements run while handling each request and reports
+    the total in the X-Query-Count header (and the debug log), so that
+    N+1 query regressions show up in development and in the tests
+    """
+    @event.listens_for(db.engine, "before_cursor_execute")
+    def _count_query(conn, cursor, statement, parameters, context, executemany):
+        if has_app_context() and "query_count" in g and not statement.startswith(_TRANSACTION_CONTROL):
+            g.query_count += 1
+
+    # reset per request: a request may share an app context (and `g`) that is already pushed
+    @app.before_request
+    def _start_query_count():
+        g.query_count = 0
+
+    @app.after_request
+    def _report_query_count(response):
+        app.logger.debug("%s queries", g.query_count)
+        response.headers["X-Query-Count"] = str(g.query_count)
+        return response
+
+def create_app(config=None):
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     app.config.from_object(Config)
+    if config:
+        app.config.update(config)
 
     db.init_app(app)
 
+    if app.config["DEBUG"] or app.config["TESTING"]:
+        with app.app_context():
+            count_queries(app)
+
     # Register blueprints
     app.register_blueprint(customers_bp)
 
@@ -18,9 +56,14 @@ def create_app():
 
     with app.app_context():
         db.create_all()
+        # do the one-off work of the first request now: configure the mappers,
+        # open a pooled connection and run a query through the compiler
+        configure_mappers()
+        db.session.execute(db.select(Customer).limit(0))
 
     return app
 
 if __name__ == "__main__":
-    app = create_app()
+    # DEBUG has to be set before create_app() returns for the query counter to be installed
+    app = create_app({"DEBUG": True})
     app.run(debug=True, host="0.0.0.0", port=8080)
\ No newline at end of file
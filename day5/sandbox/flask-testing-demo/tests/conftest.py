@@ -1,27 +1,86 @@
 import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import StaticPool
 from api.app import create_app
 from api.extensions import db
+from api.models import Customer
 
-@pytest.fixture
+def _configure_test_engine(engine):
+    """
+    the test database is throwaway, so keep its journal in memory and skip fsyncs.
+    pysqlite is told not to manage transactions (isolation_level=None in the
+    connect args): it would defer BEGIN until the first INSERT/UPDATE/DELETE, so
+    a SAVEPOINT issued before that would run outside the test's transaction.
+    SQLAlchemy emits BEGIN itself instead
+    """
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    # create_app() has already connected; start over on a connection that has the
+    # listeners (with StaticPool this also discards that first in-memory database)
+    engine.dispose()
+
+@pytest.fixture(scope="session")
 def app():
-    """Create and configure a new app instance for each test"""
-    app = create_app()
-    app.config.update({
+    """Create and configure one app instance (and schema) for the whole test session"""
+    app = create_app({
         "TESTING": True,
         "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",  # in-memory DB for tests
+        # every checkout must get the same connection, or it sees a different, empty database
+        "SQLALCHEMY_ENGINE_OPTIONS": {"connect_args": {"check_same_thread": False, "isolation_level": None}, "poolclass": StaticPool},
         "SQLALCHEMY_TRACK_MODIFICATIONS": False
     })
 
     with app.app_context():
+        _configure_test_engine(db.engine)
         db.create_all()
         yield app
         db.drop_all()
 
+@pytest.fixture(autouse=True)
+def db_session(app):
+    """
+    Runs each test inside an outer transaction that is rolled back afterwards,
+    so tests share the schema without seeing each other's rows. Commits made by
+    the app only release a SAVEPOINT inside that transaction.
+    """
+    connection = db.engine.connect()
+    transaction = connection.begin()
+    app_session = db.session
+    # a plain sessionmaker: Flask-SQLAlchemy's Session would pick the engine, not `connection`
+    db.session = scoped_session(sessionmaker(bind=connection, join_transaction_mode="create_savepoint"))
+
+    yield db.session
+
+    db.session.remove()
+    db.session = app_session
+    transaction.rollback()
+    connection.close()
+
 @pytest.fixture
 def client(app):
     """A test client for the app"""
     return app.test_client()
 
+@pytest.fixture
+def seed_customers(app):
+    """Inserts the given customer dicts with a single bulk INSERT"""
+    def _seed(rows):
+        with app.app_context():
+            db.session.execute(db.insert(Customer), rows)
+            db.session.commit()
+    return _seed
+
 @pytest.fixture
 def runner(app):
     """A CLI runner for the app"""
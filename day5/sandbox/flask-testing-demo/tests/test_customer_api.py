@@ -13,18 +13,74 @@ def test_create_customer(client):
     assert data["email"] == "vinod@vinod.co"
 
 
-def test_list_customers(client):
+def test_create_customer_missing_fields(client):
+    """Test POST /api/customers/ without the required fields"""
+    response = client.post("/api/customers/", json={"name": "Vinod", "email": "vinod@vinod.co"})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Object missing required field `phone`"
+
+    response = client.post("/api/customers/", json={"name": "Vinod", "email": "", "phone": "9731424784"})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Expected `str` of length >= 1 - at `$.email`"
+
+
+def test_create_customer_malformed_body(client):
+    """Test POST /api/customers/ with a body that isn't valid JSON"""
+    response = client.post("/api/customers/", data="{", content_type="application/json")
+    assert response.status_code == 400
+    assert response.get_json()["error"].startswith("malformed JSON body")
+
+
+def test_list_customers(client, seed_customers):
     """Test GET /api/customers/"""
-    # First, create a customer
-    client.post("/api/customers/", json={
+    # First, seed a customer directly in the database
+    seed_customers([{
         "name": "Vinod",
         "city": "Bangalore",
         "email": "vinod@vinod.co",
         "phone": "9731424784"
-    })
+    }])
 
     response = client.get("/api/customers/")
     assert response.status_code == 200
     data = response.get_json()
     assert len(data) == 1
-    assert data[0]["city"] == "Bangalore"
\ No newline at end of file
+    assert data[0]["city"] == "Bangalore"
+
+
+def test_list_customers_single_query(client, seed_customers):
+    """Test GET /api/customers/ runs one query however many customers there are"""
+    seed_customers([
+        {"name": f"Customer {i}", "email": f"customer{i}@xmpl.com", "phone": f"97314{i:05}"}
+        for i in range(50)
+    ])
+
+    response = client.get("/api/customers/")
+    assert len(response.get_json()) == 50
+    assert response.headers["X-Query-Count"] == "1"
+
+
+def test_create_customer_duplicate(client):
+    """Test POST /api/customers/ with an email or phone already in use"""
+    client.post("/api/customers/", json={
+        "name": "Vinod",
+        "city": "Bangalore",
+        "email": "vinod@vinod.co",
+        "phone": "9731424784"
+    })
+
+    response = client.post("/api/customers/", json={
+        "name": "Shyam",
+        "email": "vinod@vinod.co",
+        "phone": "9731424000"
+    })
+    assert response.status_code == 409
+    assert response.get_json()["error"] == "email already exists"
+
+    response = client.post("/api/customers/", json={
+        "name": "Shyam",
+        "email": "shyam@xmpl.com",
+        "phone": "9731424784"
+    })
+    assert response.status_code == 409
+    assert response.get_json()["error"] == "phone already exists"
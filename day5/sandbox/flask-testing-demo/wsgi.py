@@ -0,0 +1,8 @@
+"""
+WSGI entry point for production servers, e.g.
+
+    gunicorn -k gevent -w 4 --worker-connections 1000 -b 0.0.0.0:8080 wsgi:app
+"""
+from api.app import create_app
+
+app = create_app()
@@ -1,4 +1,5 @@
-from flask import Flask, jsonify
+from flask import Flask, Response
+import orjson
 
 app = Flask(__name__)
 
@@ -8,9 +9,12 @@ _customers = [
         {"id": 2, "name": "John", "city": "Delhi", "email": "john@example.com", "phone": "9812345678"}
     ]
 
+# the data never changes, so encode it once instead of on every request
+_customers_body = orjson.dumps(_customers)
+
 @app.route("/api/customers")
 def get_customers():
-    return jsonify(_customers)
+    return Response(_customers_body, mimetype="application/json")
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=6020)
\ No newline at end of file
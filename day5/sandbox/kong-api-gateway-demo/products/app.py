@@ -1,4 +1,5 @@
-from flask import Flask, jsonify
+from flask import Flask, Response
+import orjson
 
 app = Flask(__name__)
 
@@ -7,9 +8,12 @@ _products = [
         {"id": 2, "name": "Mobile", "price": 20000}
     ]
 
+# the data never changes, so encode it once instead of on every request
+_products_body = orjson.dumps(_products)
+
 @app.route("/api/products")
 def get_products():
-    return jsonify(_products)
+    return Response(_products_body, mimetype="application/json")
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=6010)
\ No newline at end of file